@@ -7,174 +7,418 @@ server log files.
 """
 
 import argparse
+import mmap
+import os
 import re
+import stat
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import pairwise, repeat
 from pathlib import Path
+from typing import Iterable, Iterator
 
+# Entry start pattern: LOG:, WARN:, or ERROR: at line beginning.
+# Compiled once and run over the whole file buffer, so the scan stays in the
+# regex engine and only visits entry boundaries. Anchoring on the preceding
+# newline rather than (?m)^ gives the engine a literal to skip ahead to,
+# which makes the scan several times faster; group 1 is the entry start.
+_ENTRY_START_RE = re.compile(rb'\n(LOG|WARN|ERROR)\s*:')
+# Same pattern for an entry at the very start of the file
+_FIRST_ENTRY_RE = re.compile(rb'(LOG|WARN|ERROR)\s*:')
 
-def parse_log_file(file_path: Path) -> list[dict]:
+# First line of an entry with a timestamp like "f:0, t:1771295104050>" or
+# just "t:1771295104050>". Groups: type, category, timestamp; the message
+# starts where the match ends.
+_TS_RE = re.compile(r'^(LOG|WARN|ERROR)\s*:\s*(\S+)\s+(?:f:\d+,\s*)?t:(\d+)>')
+
+# Entry types, interned so they can be compared by identity. The parser
+# maps the raw type bytes onto these singletons instead of decoding them.
+_LOG, _WARN, _ERROR = map(sys.intern, ('LOG', 'WARN', 'ERROR'))
+_ENTRY_TYPES = {b'LOG': _LOG, b'WARN': _WARN, b'ERROR': _ERROR}
+
+# Keywords that make a LOG entry relevant (case-insensitive)
+DEFAULT_KEYWORDS = ['error', 'warning', 'err', 'warn']
+
+# Output buffer size and number of formatted entries per write() call
+REPORT_BUFFER_SIZE = 1 << 20
+REPORT_BATCH_SIZE = 256
+
+# Target size of the byte ranges the log is split into for parsing; ranges
+# are parsed and filtered in parallel when more than one job is allowed
+SPLIT_SIZE = 16 << 20
+
+# Chunk size for reading logs that cannot be memory-mapped (pipes, FIFOs)
+READ_SIZE = 1 << 20
+
+# Deduplication key: (type, category, message), see extract_timestamp_and_key()
+DedupKey = tuple[str | None, str | None, str]
+
+
+@dataclass
+class Entries:
     """
-    Parse the log file and return a list of entries.
-    Each entry is a dict with 'type', 'content', and 'clean_content'.
+    Unique log entries stored as parallel lists, indexed by entry id.
+    Filled by add_unique_entries().
     """
-    # Entry start pattern: LOG:, WARN:, or ERROR: at line beginning
-    entry_start_pattern = re.compile(r'^(LOG|WARN|ERROR)\s*:')
-
-    entries = []
-    current_entry = None
-
-    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-        for line in f:
-            # Check if this line starts a new entry
-            match = entry_start_pattern.match(line)
-
-            if match:
-                # Save the previous entry if exists
-                if current_entry is not None:
-                    entries.append(current_entry)
-
-                # Start a new entry
-                entry_type = match.group(1)  # LOG, WARN, or ERROR
-                current_entry = {
-                    'type': entry_type,
-                    'content': line,
-                    # For deduplication, we'll compute this later
-                    'clean_content': None
-                }
-            elif current_entry is not None:
-                # Continue the current multi-line entry
-                current_entry['content'] += line
-            else:
-                # Lines before the first entry - skip them
-                pass
+    types: list[str] = field(default_factory=list)
+    # Dedup key per entry; the report body is only formatted from it while
+    # the report is written, so bodies are never held in memory
+    keys: list[DedupKey] = field(default_factory=list)
+    # Timestamp range and number of timestamped occurrences per entry;
+    # ts_min/ts_max are 0 while ts_counts is 0
+    ts_min: list[int] = field(default_factory=list)
+    ts_max: list[int] = field(default_factory=list)
+    ts_counts: list[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+
+def parse_log_file(
+    file_path: Path,
+    start: int = 0,
+    end: int | None = None
+) -> Iterator[tuple[str, str]]:
+    """
+    Parse the log file, yielding (type, content) for each entry.
+
+    The file is memory-mapped and scanned for entry starts in a single
+    regex pass; each entry is then sliced out of the map in one piece.
+    Entries are yielded as they are found so callers can filter them
+    without materializing the whole file.
+
+    'start' and 'end' restrict parsing to a byte range of the file; the last
+    entry in the range ends at 'end'. See split_log_file(). Streams that
+    cannot be mapped are read sequentially and always parsed whole.
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        st = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            yield from _read_log_stream(f.fileno())
+            return
+
+        # mmap refuses to map an empty file
+        if st.st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if end is None:
+                end = len(mm)
+            _advise_sequential(f.fileno(), mm, start, end)
+
+            # Lines before the first entry are never part of a match - skip them
+            prev = None
+            for match in _iter_entry_starts(mm, start, end):
+                # An entry runs until the next entry start or the range end
+                if prev is not None:
+                    yield _slice_entry(mm, prev, match.start(1))
+                prev = match
+
+            if prev is not None:
+                yield _slice_entry(mm, prev, end)
+
+
+def split_log_file(
+    file_path: Path,
+    split_size: int = SPLIT_SIZE
+) -> list[tuple[int, int | None]]:
+    """
+    Split the log file into (start, end) byte ranges of roughly 'split_size'
+    bytes. Every boundary is snapped forward to an entry start, so each
+    entry falls entirely within one range. A stream that cannot be
+    memory-mapped is returned as a single (0, None) range.
+    """
+    # stat() rather than open(): opening a FIFO here would consume it
+    if not stat.S_ISREG(os.stat(file_path).st_mode):
+        return [(0, None)]
+
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+
+        bounds = [0]
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = split_size
+            while pos < size:
+                # Include the byte before 'pos' so an entry starting exactly
+                # at 'pos' is found by its preceding newline
+                match = _ENTRY_START_RE.search(mm, pos - 1)
+                if match is None:
+                    break
+                bounds.append(match.start(1))
+                pos = match.start(1) + split_size
+
+        bounds.append(size)
+        return list(pairwise(bounds))
+
+
+def _advise_sequential(fd: int, mm: mmap.mmap, start: int, end: int) -> None:
+    """
+    Hint the kernel that bytes start..end of the file are read once, front
+    to back, so it reads ahead aggressively and can drop consumed pages.
+    The hints are skipped where unavailable (e.g. Windows).
+    """
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, start, end - start, os.POSIX_FADV_SEQUENTIAL)
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            # madvise() needs a page-aligned start
+            page_start = start - start % mmap.PAGESIZE
+            mm.madvise(mmap.MADV_SEQUENTIAL, page_start, end - page_start)
+    except OSError:
+        # Only a hint - parsing works the same without it
+        pass
+
+
+def _read_log_stream(fd: int) -> Iterator[tuple[str, str]]:
+    """
+    Parse a log stream read with os.read() in READ_SIZE chunks, yielding
+    (type, content) for each entry like parse_log_file().
 
-        # Don't forget the last entry
-        if current_entry is not None:
-            entries.append(current_entry)
+    Only the bytes from the last entry start onwards are carried over to
+    the next chunk, since that entry may not be complete yet.
+    """
+    buf = bytearray()
+    while True:
+        data = os.read(fd, READ_SIZE)
+        if not data:
+            break
+        buf += data
+
+        prev = None
+        for match in _iter_entry_starts(buf, 0, len(buf)):
+            if prev is not None:
+                yield _slice_entry(buf, prev, match.start(1))
+            prev = match
+
+        if prev is not None:
+            del buf[:prev.start(1)]
+        else:
+            # No entry yet - drop the complete lines before the first entry
+            nl = buf.rfind(b'\n')
+            if nl > 0:
+                del buf[:nl]
+
+    # Whatever is left is either the last entry or lines without any entry
+    last = _FIRST_ENTRY_RE.match(buf)
+    if last is not None:
+        yield _slice_entry(buf, last, len(buf))
+
+
+def _iter_entry_starts(
+    mm: mmap.mmap | bytearray,
+    start: int,
+    end: int
+) -> Iterator[re.Match[bytes]]:
+    """Yield a match for each entry start in mm[start:end]; group 1 is the type."""
+    if start == 0:
+        first = _FIRST_ENTRY_RE.match(mm, 0, end)
+        if first is not None:
+            yield first
+    # An entry at 'start' is preceded by the newline at 'start - 1'
+    yield from _ENTRY_START_RE.finditer(mm, max(start - 1, 0), end)
+
+
+def _slice_entry(
+    mm: mmap.mmap | bytearray,
+    match: re.Match[bytes],
+    end: int
+) -> tuple[str, str]:
+    """Decode the entry starting at 'match' and ending at 'end'."""
+    content = mm[match.start(1):end].decode('utf-8', 'replace')
+    # Match text-mode universal newline handling
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+
+    return _ENTRY_TYPES[match.group(1)], content  # LOG, WARN, or ERROR
+
+
+def build_keywords(additional_keywords: list[str] | None = None) -> tuple[str, ...]:
+    """
+    Lowercase the default and additional keywords for should_include_entry().
 
-    return entries
+    Keywords containing another keyword are dropped since they can never
+    decide a match on their own (e.g. 'error' is covered by 'err').
+    """
+    keywords = dict.fromkeys(k.lower() for k in DEFAULT_KEYWORDS + (additional_keywords or []))
+    return tuple(k for k in keywords if not any(other != k and other in k for other in keywords))
 
 
-def should_include_entry(entry: dict, additional_keywords: list[str] | None = None) -> bool:
+def should_include_entry(entry_type: str, content: str, keywords: tuple[str, ...]) -> bool:
     """
     Determine if an entry should be included based on filtering rules.
 
     Include criteria:
     1. All ERROR and WARN entries
-    2. LOG entries containing error/warning keywords (case-insensitive)
+    2. LOG entries containing any of 'keywords' (case-insensitive,
+       see build_keywords)
     """
-    entry_type = entry['type']
-    content = entry['content']
-
     # Always include ERROR and WARN entries
-    if entry_type in ('ERROR', 'WARN'):
+    if entry_type is not _LOG:
         return True
 
-    # For LOG entries, check for error/warning keywords
-    if entry_type == 'LOG':
-        content_lower = content.lower()
-
-        # Default keywords to check
-        default_keywords = ['error', 'warning', 'err', 'warn']
+    # Lowercasing once and using substring search is far faster than a
+    # case-insensitive regex, which CPython cannot scan ahead with. It also
+    # beat filtering the raw bytes before decoding (bytes.lower() per entry,
+    # or once per range with bounded bytes.find()): bytes searches carry more
+    # per-call overhead than the str allocation they save.
+    content_lower = content.lower()
+    for keyword in keywords:
+        if keyword in content_lower:
+            return True
 
-        # Check default keywords
-        for keyword in default_keywords:
-            if keyword in content_lower:
-                return True
+    return False
 
-        # Check additional keywords if provided
-        if additional_keywords:
-            for keyword in additional_keywords:
-                if keyword.lower() in content_lower:
-                    return True
 
-    return False
+def filter_log_range(
+    file_path: Path,
+    start: int,
+    end: int | None,
+    keywords: tuple[str, ...]
+) -> tuple[int, list[tuple[str, str]]]:
+    """
+    Parse one byte range of the log file and keep the entries that pass
+    should_include_entry(). Runs in worker processes, see scan_log_file().
+    Returns (number of entries parsed, included (type, content) entries).
+    """
+    total_count = 0
+    included = []
+    # Bind lookups to locals; the loop runs once per parsed entry
+    include = should_include_entry
+    add = included.append
+    for entry_type, content in parse_log_file(file_path, start, end):
+        total_count += 1
+        if include(entry_type, content, keywords):
+            add((entry_type, content))
+    return total_count, included
+
+
+def scan_log_file(
+    file_path: Path,
+    keywords: tuple[str, ...],
+    jobs: int = 1
+) -> Iterator[tuple[int, list[tuple[str, str]]]]:
+    """
+    Run filter_log_range() over every range from split_log_file(), yielding
+    the results in file order. Ranges are handled by up to 'jobs' worker
+    processes; small files and jobs=1 are handled in this process.
+    """
+    ranges = split_log_file(file_path)
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    args = (repeat(file_path), starts, ends, repeat(keywords))
+
+    if jobs > 1 and len(ranges) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as executor:
+            yield from executor.map(filter_log_range, *args)
+    else:
+        yield from map(filter_log_range, *args)
 
 
-def extract_timestamp_and_body(content: str) -> tuple[str | None, str]:
+def extract_timestamp_and_key(content: str) -> tuple[int | None, DedupKey]:
     """
-    Extract timestamp and message body from entry content.
+    Extract timestamp and deduplication key from entry content.
 
     Pattern: f:<number>, t:<timestamp>> or just t:<timestamp>>
-    Returns (timestamp, body_without_timestamp)
-    """
-    # Pattern to match timestamp like "f:0, t:1771295104050>" or just "t:1771295104050>"
-    timestamp_pattern = re.compile(r'^(LOG|WARN|ERROR)\s*:\s*\S+\s+(f:\d+,\s*)?t:(\d+)>(.*)$', re.MULTILINE)
+    Returns (timestamp, key) where key is (type, category, message) with the
+    frame and timestamp left out. Entries without a timestamp are keyed by
+    their stripped content alone.
 
-    # Check first line for timestamp
-    lines = content.split('\n', 1)
-    first_line = lines[0] if lines else ''
-    rest = lines[1] if len(lines) > 1 else ''
+    The key is built from the original content with a single slice, so
+    deduplication never pays for a reformatted body; see format_body().
+    """
+    # Check first line for timestamp, bounding the match instead of
+    # splitting the content
+    nl = content.find('\n')
+    first_line_end = len(content) if nl < 0 else nl
 
-    match = timestamp_pattern.match(first_line)
+    match = _TS_RE.match(content, 0, first_line_end)
     if match:
-        timestamp = match.group(3)
-        # Reconstruct the body: type + category + rest of message (without timestamp)
-        entry_type = match.group(1)
-        # Extract category (the word after type, before f: or t:)
-        category_match = re.match(r'^(LOG|WARN|ERROR)\s*:\s*(\S+)\s+', first_line)
-        category = category_match.group(2) if category_match else ''
-        message_rest = match.group(4)
+        entry_type, category, timestamp = match.groups()
+        # Message runs from after the timestamp to the end of the entry
+        message = content[match.end():].rstrip()
+        return int(timestamp), (entry_type, category, message)
 
-        # Build body without timestamp
-        body_first_line = f"{entry_type} : {category}{message_rest}"
-        body = body_first_line + ('\n' + rest if rest else '')
-        return timestamp, body.strip()
+    return None, (None, None, content.strip())
 
-    return None, content.strip()
 
+def format_body(key: DedupKey) -> str:
+    """Build the report body (entry without timestamp) from a dedup key."""
+    entry_type, category, message = key
+    if category is None:
+        return message
+    return f"{entry_type} : {category}{message}"
 
-def deduplicate_entries(entries: list[dict]) -> list[dict]:
-    """
-    Remove duplicate entries based on message body (excluding timestamp).
-    Returns a list of unique entries preserving original order.
-    Each entry has 'timestamps' list containing all timestamps for duplicates.
-    """
-    body_to_entry: dict[str, dict] = {}
 
-    for entry in entries:
-        timestamp, body = extract_timestamp_and_body(entry['content'])
+def add_unique_entries(
+    unique: Entries,
+    key_to_first_idx: dict[DedupKey, int],
+    entries: Iterable[tuple[str, str]]
+) -> None:
+    """
+    Add each (type, content) entry to 'unique' unless its message body
+    (excluding timestamp) was already seen, in which case only its
+    timestamp is recorded.
 
-        if body not in body_to_entry:
+    'key_to_first_idx' maps each dedup key to the id of its first occurrence
+    in 'unique' and must be shared across calls.
+    """
+    # Bind lookups to locals; the loop runs once per included entry
+    extract = extract_timestamp_and_key
+    get_first_idx = key_to_first_idx.get
+    add_type = unique.types.append
+    add_key = unique.keys.append
+    ts_min = unique.ts_min
+    ts_max = unique.ts_max
+    ts_counts = unique.ts_counts
+
+    for entry_type, content in entries:
+        timestamp, key = extract(content)
+
+        first_idx = get_first_idx(key)
+        if first_idx is None:
             # First occurrence - create new entry
-            body_to_entry[body] = {
-                'type': entry['type'],
-                'content': entry['content'],
-                'body': body,
-                'timestamps': [timestamp] if timestamp else [],
-                'first_index': len(body_to_entry)  # Preserve order
-            }
-        else:
-            # Duplicate - add timestamp to existing entry
-            if timestamp:
-                body_to_entry[body]['timestamps'].append(timestamp)
-
-    # Convert dict back to list, preserving original order
-    unique_entries = sorted(body_to_entry.values(), key=lambda x: x['first_index'])
-    return unique_entries
-
-
-def format_timestamp_range(timestamps: list[str]) -> str:
-    """Format timestamp list as range or single timestamp."""
-    if not timestamps:
+            key_to_first_idx[key] = len(ts_counts)
+            add_type(entry_type)
+            add_key(key)
+            if timestamp is None:
+                ts_min.append(0)
+                ts_max.append(0)
+                ts_counts.append(0)
+            else:
+                ts_min.append(timestamp)
+                ts_max.append(timestamp)
+                ts_counts.append(1)
+        elif timestamp is not None:
+            # Duplicate - widen the existing entry's timestamp range
+            if timestamp < ts_min[first_idx]:
+                ts_min[first_idx] = timestamp
+            if timestamp > ts_max[first_idx]:
+                ts_max[first_idx] = timestamp
+            ts_counts[first_idx] += 1
+
+
+def format_timestamp_range(ts_min: int, ts_max: int, ts_count: int) -> str:
+    """Format timestamp range as range or single timestamp."""
+    if ts_count == 0:
         return "N/A"
-    if len(timestamps) == 1:
-        return timestamps[0]
-    # Sort timestamps numerically
-    sorted_ts = sorted(timestamps, key=int)
-    return f"{sorted_ts[0]} ~ {sorted_ts[-1]} (x{len(timestamps)})"
+    if ts_count == 1:
+        return str(ts_min)
+    return f"{ts_min} ~ {ts_max} (x{ts_count})"
 
 
 def generate_report(
-    entries: list[dict],
+    entries: Entries,
     source_filename: str,
     output_path: Path
 ) -> None:
     """Generate the filtered log report file."""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    with open(output_path, 'w', encoding='utf-8') as f:
+    with open(output_path, 'w', encoding='utf-8', buffering=REPORT_BUFFER_SIZE) as f:
         # Write header
         f.write('=== Project Zomboid Server Log Filter Report ===\n')
         f.write(f'Source: {source_filename}\n')
@@ -182,18 +426,21 @@ def generate_report(
         f.write(f'Unique entries found: {len(entries)}\n')
         f.write('\n')
 
-        # Write each entry
-        for i, entry in enumerate(entries, 1):
-            f.write(f'--- Entry {i} ---\n')
-            # Write timestamp range
-            ts_range = format_timestamp_range(entry.get('timestamps', []))
-            f.write(f'Timestamp: {ts_range}\n')
-            # Write the body (message without timestamp)
-            f.write(entry['body'])
+        # Format each entry as one chunk and write them in batches
+        parts = []
+        ts_ranges = zip(entries.ts_min, entries.ts_max, entries.ts_counts)
+        for i, (key, (ts_min, ts_max, ts_count)) in enumerate(zip(entries.keys, ts_ranges), 1):
+            body = format_body(key)
+            ts_range = format_timestamp_range(ts_min, ts_max, ts_count)
             # Ensure entry ends with a newline
-            if not entry['body'].endswith('\n'):
-                f.write('\n')
-            f.write('\n')
+            eol = '' if body.endswith('\n') else '\n'
+            parts.append(f'--- Entry {i} ---\nTimestamp: {ts_range}\n{body}{eol}\n')
+
+            if len(parts) >= REPORT_BATCH_SIZE:
+                f.write(''.join(parts))
+                parts.clear()
+
+        f.write(''.join(parts))
 
 
 def main() -> int:
@@ -213,6 +460,12 @@ def main() -> int:
         '--keywords',
         help='Additional keywords to filter (comma-separated)'
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of worker processes for parsing large logs (default: CPU count)'
+    )
 
     args = parser.parse_args()
 
@@ -233,20 +486,24 @@ def main() -> int:
     if args.keywords:
         additional_keywords = [k.strip() for k in args.keywords.split(',') if k.strip()]
 
-    # Parse the log file
+    keywords = build_keywords(additional_keywords)
+
+    # Parse and filter each range of the file (in parallel for large logs),
+    # then deduplicate the included entries in file order; rejected entries
+    # are dropped as soon as they are parsed
     print(f'Parsing log file: {log_file_path}')
-    entries = parse_log_file(log_file_path)
-    print(f'Total entries parsed: {len(entries)}')
-
-    # Filter entries
-    filtered_entries = [
-        entry for entry in entries
-        if should_include_entry(entry, additional_keywords)
-    ]
-    print(f'Entries matching filter criteria: {len(filtered_entries)}')
-
-    # Deduplicate
-    unique_entries = deduplicate_entries(filtered_entries)
+    unique_entries = Entries()
+    key_to_first_idx: dict[DedupKey, int] = {}
+    total_count = 0
+    matched_count = 0
+
+    for range_count, included in scan_log_file(log_file_path, keywords, args.jobs):
+        total_count += range_count
+        matched_count += len(included)
+        add_unique_entries(unique_entries, key_to_first_idx, included)
+
+    print(f'Total entries parsed: {total_count}')
+    print(f'Entries matching filter criteria: {matched_count}')
     print(f'Unique entries after deduplication: {len(unique_entries)}')
 
     # Generate report